@@ -17,16 +17,23 @@ Output: pivot_app/data/characterisation.json
     },
     ...
   ]
+
+Run:
+    python3 scripts/convert_characterisation.py
+    python3 scripts/convert_characterisation.py --sqlite  # also load into SQLite
 """
 
 from __future__ import annotations
 
+import argparse
 import json
 from pathlib import Path
 from typing import Any, Dict, List
 
 import pandas as pd
 
+from sqlite_sink import add_sqlite_argument, write_tables
+
 ROOT = Path(__file__).resolve().parents[1]
 SOURCE = ROOT / "characterisation" / "characterisation.xlsx"
 TARGET = ROOT / "pivot_app" / "data" / "characterisation.json"
@@ -78,7 +85,18 @@ def parse_sheet(xl: pd.ExcelFile, sheet_name: str) -> Dict[str, Any] | None:
   }
 
 
+def flatten_categories(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+  rows: List[Dict[str, Any]] = []
+  for rec in records:
+    for cat in rec["categories"]:
+      rows.append({"product_id": rec["product_id"], "product_name": rec["product_name"], **cat})
+  return rows
+
+
 def main() -> None:
+  parser = argparse.ArgumentParser(description="Parse characterisation Excel sheets into a JSON bundle.")
+  add_sqlite_argument(parser)
+  args = parser.parse_args()
   if not SOURCE.exists():
     raise SystemExit(f"Source file not found: {SOURCE}")
   xl = pd.ExcelFile(SOURCE)
@@ -90,6 +108,8 @@ def main() -> None:
   TARGET.parent.mkdir(parents=True, exist_ok=True)
   TARGET.write_text(json.dumps(records, indent=2))
   print(f"Wrote {len(records)} records to {TARGET.relative_to(ROOT)}")
+  if args.sqlite:
+    write_tables(args.sqlite, {"characterisation": flatten_categories(records)})
 
 
 if __name__ == "__main__":
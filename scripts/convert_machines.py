@@ -3,15 +3,19 @@ Convert machine operations pivot table into JSON for the front-end.
 
 Run:
     python3 scripts/convert_machines.py
+    python3 scripts/convert_machines.py --sqlite  # also load into SQLite
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
 import json
 from pathlib import Path
 from typing import Any, Dict
 
+from sqlite_sink import add_sqlite_argument, write_tables
+
 
 ROOT = Path(__file__).resolve().parents[1]
 SOURCE = ROOT / "pivot_tables" / "operations_mastersheet - Machines_No_Inputs.csv"
@@ -100,11 +104,16 @@ def base_farmer_id(dmu_id: str | None) -> str:
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_sqlite_argument(parser)
+    args = parser.parse_args()
     records = build_records()
     TARGET.parent.mkdir(parents=True, exist_ok=True)
     with TARGET.open("w", encoding="utf-8") as dest:
         json.dump(records, dest, indent=2)
     print(f"Wrote {len(records)} records to {TARGET.relative_to(ROOT)}")
+    if args.sqlite:
+        write_tables(args.sqlite, {"machines": records})
 
 
 if __name__ == "__main__":
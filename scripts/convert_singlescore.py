@@ -6,15 +6,19 @@ Output: pivot_app/data/singlescore.json
 
 Run:
     python3 scripts/convert_singlescore.py
+    python3 scripts/convert_singlescore.py --sqlite  # also load into SQLite
 """
 
 from __future__ import annotations
 
+import argparse
 import json
 from glob import glob
 from pathlib import Path
 from typing import Any, Dict, List
 
+from sqlite_sink import add_sqlite_argument, write_tables
+
 
 ROOT = Path(__file__).resolve().parents[1]
 SOURCE_GLOB = str(ROOT / "singlescore" / "singlescore_*.json")
@@ -93,7 +97,40 @@ def aggregate_special(records: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
     return combined
 
 
+def flatten_records(records: list[Dict[str, Any]]) -> Dict[str, list[Dict[str, Any]]]:
+    categories: list[Dict[str, Any]] = []
+    contributors: list[Dict[str, Any]] = []
+    for rec in records:
+        product_id = rec.get("product_id")
+        for cat in rec.get("categories", []):
+            categories.append(
+                {
+                    "product_id": product_id,
+                    "product_name": rec.get("product_name", product_id),
+                    "functional_unit": rec.get("functional_unit"),
+                    "source": rec.get("source"),
+                    "impact_category": cat.get("impact_category"),
+                    "unit": cat.get("unit"),
+                    "total": cat.get("total"),
+                }
+            )
+            for contrib in cat.get("contributors", []):
+                contributors.append(
+                    {
+                        "product_id": product_id,
+                        "impact_category": cat.get("impact_category"),
+                        "name": contrib.get("name"),
+                        "score": contrib.get("score"),
+                        "share": contrib.get("share"),
+                    }
+                )
+    return {"singlescore": categories, "singlescore_contributors": contributors}
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_sqlite_argument(parser)
+    args = parser.parse_args()
     files = sorted(Path(p) for p in glob(SOURCE_GLOB))
     if not files:
         raise SystemExit("No singlescore files found.")
@@ -102,6 +139,8 @@ def main() -> None:
     TARGET.parent.mkdir(parents=True, exist_ok=True)
     TARGET.write_text(json.dumps(records, indent=2))
     print(f"Wrote {len(records)} records to {TARGET.relative_to(ROOT)}")
+    if args.sqlite:
+        write_tables(args.sqlite, flatten_records(records))
 
 
 if __name__ == "__main__":
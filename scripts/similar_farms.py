@@ -0,0 +1,330 @@
+"""
+Find the farms (DMUs) most similar to a given dmu_id in inputs and impacts.
+
+Each DMU becomes one feature vector built from:
+  - the per-ha and per-t impact categories in lca_chara_inputs.json
+  - practice features from the converted pivot tables (crop protection and
+    seed doses, N/P/K rates, machine passes), all expressed per ha
+
+Features are z-score standardised and searched with an exact, blocked
+Euclidean scan in NumPy, which stays under a millisecond per query for
+tens of thousands of DMUs.
+
+Run:
+    python3 scripts/similar_farms.py knn C1_2022 -k 5
+    python3 scripts/similar_farms.py radius C1_2022 -r 3.0
+    python3 scripts/similar_farms.py export -k 10
+
+The export writes pivot_app/data/similar_farms.json:
+  {
+    "k": 10,
+    "features": ["perHaCats:Climate change", ...],
+    "neighbours": {
+      "<dmu_id>": [
+        {"dmu_id": "...", "distance": <float>, "lower_per_t": ["Climate change", ...]}
+      ]
+    }
+  }
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "pivot_app" / "data"
+TARGET_NAME = "similar_farms.json"
+
+# Top-level impact categories only; the " - " sub-categories split these up
+# and would double their weight in the distance.
+IMPACT_GROUPS = ("perHaCats", "perTCats")
+
+PRACTICE_FEATURES = (
+    "herbicide_kg_ha",
+    "fungicide_kg_ha",
+    "insecticide_kg_ha",
+    "seed_kg_ha",
+    "n_kg_ha",
+    "p_kg_ha",
+    "k_kg_ha",
+    "machine_passes",
+)
+
+# Map crop protection operations to the dose feature they feed.
+CROP_PROTECTION_FEATURES = {
+    "herbicide": "herbicide_kg_ha",
+    "fungicide": "fungicide_kg_ha",
+    "insecticide": "insecticide_kg_ha",
+    "pesticide": "insecticide_kg_ha",
+}
+
+BLOCK_SIZE = 4096
+
+
+def load_json(data_dir: Path, name: str) -> list[Dict[str, Any]]:
+    path = data_dir / name
+    if not path.exists():
+        raise SystemExit(f"Source file not found: {path}")
+    return json.loads(path.read_text())
+
+
+def as_number(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def practice_features(data_dir: Path) -> Dict[str, Dict[str, float]]:
+    """Area-weighted practice rates per DMU, keyed by dmu_id."""
+    totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    sown_area: Dict[str, float] = defaultdict(float)
+    fallback_area: Dict[str, float] = defaultdict(float)
+
+    for row in load_json(data_dir, "sowing.json"):
+        dmu_id = row.get("dmu_id")
+        area = as_number(row.get("covered_area")) or as_number(row.get("area_ha"))
+        dose = as_number(row.get("dose_kg_ha"))
+        if not dmu_id or not area:
+            continue
+        sown_area[dmu_id] += area
+        if dose is not None:
+            totals[dmu_id]["seed_kg_ha"] += dose * area
+
+    for row in load_json(data_dir, "operations.json"):
+        dmu_id = row.get("dmu_id")
+        feature = CROP_PROTECTION_FEATURES.get(row.get("operation_normalized", ""))
+        area = as_number(row.get("covered_area")) or as_number(row.get("area_ha"))
+        dose = as_number(row.get("dose_kg_ha"))
+        if not dmu_id or feature is None or not area or dose is None:
+            continue
+        totals[dmu_id][feature] += dose * area
+
+    for row in load_json(data_dir, "fertilisation.json"):
+        dmu_id = row.get("dmu_id")
+        area = as_number(row.get("covered_area")) or as_number(row.get("area_TOTAL"))
+        if not dmu_id or not area:
+            continue
+        fallback_area[dmu_id] = max(fallback_area[dmu_id], as_number(row.get("area_TOTAL")) or 0.0)
+        for nutrient in ("n", "p", "k"):
+            rate = as_number(row.get(f"{nutrient}_kg_ha_weight"))
+            if rate is not None:
+                totals[dmu_id][f"{nutrient}_kg_ha"] += rate * area
+
+    for row in load_json(data_dir, "machines.json"):
+        dmu_id = row.get("dmu_id")
+        worked = as_number(row.get("total_area_worked"))
+        if not dmu_id or worked is None:
+            continue
+        fallback_area[dmu_id] = max(fallback_area[dmu_id], as_number(row.get("area_ha")) or 0.0)
+        totals[dmu_id]["machine_passes"] += worked
+
+    features: Dict[str, Dict[str, float]] = {}
+    for dmu_id, sums in totals.items():
+        area = sown_area.get(dmu_id) or fallback_area.get(dmu_id)
+        if not area:
+            continue
+        features[dmu_id] = {name: sums.get(name, 0.0) / area for name in PRACTICE_FEATURES}
+    return features
+
+
+class SimilarityIndex:
+    """Standardised DMU feature matrix with exact k-NN and radius queries."""
+
+    def __init__(
+        self,
+        dmu_ids: List[str],
+        farmer_ids: List[str],
+        feature_names: List[str],
+        matrix: np.ndarray,
+        per_t: Dict[str, Dict[str, float]],
+        block_size: int = BLOCK_SIZE,
+    ) -> None:
+        if len(dmu_ids) != matrix.shape[0]:
+            raise ValueError("dmu_ids and matrix rows differ in length")
+        self.dmu_ids = dmu_ids
+        self.farmer_ids = np.asarray(farmer_ids)
+        self.feature_names = feature_names
+        self.per_t = per_t
+        self.block_size = block_size
+        self.position = {dmu_id: idx for idx, dmu_id in enumerate(dmu_ids)}
+
+        raw = np.asarray(matrix, dtype=np.float64)
+        self.mean = np.nanmean(raw, axis=0) if raw.size else np.zeros(raw.shape[1])
+        self.scale = np.nanstd(raw, axis=0) if raw.size else np.ones(raw.shape[1])
+        self.mean = np.nan_to_num(self.mean)
+        self.scale = np.where(np.nan_to_num(self.scale) > 0, self.scale, 1.0)
+        # Missing values sit at the column mean, i.e. 0 after standardising.
+        self.vectors = np.nan_to_num((raw - self.mean) / self.scale)
+        self.sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path = DATA_DIR, block_size: int = BLOCK_SIZE) -> "SimilarityIndex":
+        lca = load_json(data_dir, "lca_chara_inputs.json")
+        practice = practice_features(data_dir)
+        categories = sorted(
+            {
+                cat
+                for rec in lca
+                for group in IMPACT_GROUPS
+                for cat in (rec.get(group) or {})
+                if " - " not in cat
+            }
+        )
+        feature_names = [f"{group}:{cat}" for group in IMPACT_GROUPS for cat in categories]
+        feature_names += [f"practice:{name}" for name in PRACTICE_FEATURES]
+
+        dmu_ids: List[str] = []
+        farmer_ids: List[str] = []
+        rows: List[List[float]] = []
+        per_t: Dict[str, Dict[str, float]] = {}
+        for rec in lca:
+            dmu_id = rec.get("dmu_id")
+            if not dmu_id:
+                continue
+            row: List[float] = []
+            for group in IMPACT_GROUPS:
+                cats = rec.get(group) or {}
+                for cat in categories:
+                    value = as_number(cats.get(cat))
+                    row.append(np.nan if value is None else value)
+            dmu_practice = practice.get(dmu_id, {})
+            row += [dmu_practice.get(name, np.nan) for name in PRACTICE_FEATURES]
+            dmu_ids.append(dmu_id)
+            farmer_ids.append(rec.get("farmer_id") or dmu_id)
+            rows.append(row)
+            per_t[dmu_id] = {
+                cat: value
+                for cat, value in (rec.get("perTCats") or {}).items()
+                if cat in categories and as_number(value) is not None
+            }
+        matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(feature_names))
+        return cls(dmu_ids, farmer_ids, feature_names, matrix, per_t, block_size)
+
+    def _row(self, dmu_id: str) -> int:
+        try:
+            return self.position[dmu_id]
+        except KeyError:
+            raise KeyError(f"Unknown dmu_id: {dmu_id}") from None
+
+    def _distances(self, query: np.ndarray, start: int, stop: int) -> np.ndarray:
+        block = self.vectors[start:stop]
+        sq = self.sq_norms[start:stop] - 2.0 * (block @ query) + query @ query
+        return np.sqrt(np.maximum(sq, 0.0))
+
+    def _candidates(self, row: int, exclude_same_farmer: bool) -> np.ndarray:
+        mask = np.ones(len(self.dmu_ids), dtype=bool)
+        mask[row] = False
+        if exclude_same_farmer:
+            mask &= self.farmer_ids != self.farmer_ids[row]
+        return mask
+
+    def lower_per_t(self, dmu_id: str, other_id: str) -> List[str]:
+        """Impact categories where other_id has a lower per-tonne value than dmu_id."""
+        mine = self.per_t.get(dmu_id, {})
+        theirs = self.per_t.get(other_id, {})
+        return sorted(cat for cat, value in theirs.items() if cat in mine and value < mine[cat])
+
+    def _result(self, dmu_id: str, idx: int, distance: float) -> Dict[str, Any]:
+        other_id = self.dmu_ids[idx]
+        return {
+            "dmu_id": other_id,
+            "distance": float(distance),
+            "lower_per_t": self.lower_per_t(dmu_id, other_id),
+        }
+
+    def _all_distances(self, row: int, exclude_same_farmer: bool) -> np.ndarray:
+        query = self.vectors[row]
+        dist = np.empty(len(self.dmu_ids))
+        for start in range(0, len(self.dmu_ids), self.block_size):
+            stop = min(start + self.block_size, len(self.dmu_ids))
+            dist[start:stop] = self._distances(query, start, stop)
+        dist[~self._candidates(row, exclude_same_farmer)] = np.inf
+        return dist
+
+    def knn(self, dmu_id: str, k: int = 5, exclude_same_farmer: bool = False) -> List[Dict[str, Any]]:
+        row = self._row(dmu_id)
+        dist = self._all_distances(row, exclude_same_farmer)
+        k = min(k, int(np.isfinite(dist).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.lexsort((top, dist[top]))]
+        return [self._result(dmu_id, idx, dist[idx]) for idx in top]
+
+    def radius(self, dmu_id: str, r: float, exclude_same_farmer: bool = False) -> List[Dict[str, Any]]:
+        row = self._row(dmu_id)
+        dist = self._all_distances(row, exclude_same_farmer)
+        hits = np.flatnonzero(dist <= r)
+        hits = hits[np.lexsort((hits, dist[hits]))]
+        return [self._result(dmu_id, idx, dist[idx]) for idx in hits]
+
+    def export(self, k: int = 10, exclude_same_farmer: bool = False) -> Dict[str, Any]:
+        return {
+            "k": k,
+            "exclude_same_farmer": exclude_same_farmer,
+            "features": self.feature_names,
+            "neighbours": {
+                dmu_id: self.knn(dmu_id, k, exclude_same_farmer) for dmu_id in self.dmu_ids
+            },
+        }
+
+
+def print_results(dmu_id: str, results: List[Dict[str, Any]]) -> None:
+    print(f"Similar farms for {dmu_id}:")
+    for res in results:
+        lower = "; ".join(res["lower_per_t"]) or "-"
+        print(f"  {res['dmu_id']:<12} distance={res['distance']:.3f}  lower per t: {lower}")
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="directory holding the converted JSON files")
+    parser.add_argument(
+        "--exclude-same-farmer",
+        action="store_true",
+        help="skip other seasons of the query DMU's farmer",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    knn_cmd = sub.add_parser("knn", help="k nearest DMUs to a dmu_id")
+    knn_cmd.add_argument("dmu_id")
+    knn_cmd.add_argument("-k", type=int, default=5)
+
+    radius_cmd = sub.add_parser("radius", help="DMUs within a standardised distance of a dmu_id")
+    radius_cmd.add_argument("dmu_id")
+    radius_cmd.add_argument("-r", "--radius", type=float, required=True)
+
+    export_cmd = sub.add_parser("export", help="write precomputed top-k neighbours for the dashboards")
+    export_cmd.add_argument("-k", type=int, default=10)
+    export_cmd.add_argument("--output", type=Path, default=None)
+
+    args = parser.parse_args(argv)
+    index = SimilarityIndex.from_data_dir(args.data_dir)
+
+    if args.command == "export":
+        target = args.output or args.data_dir / TARGET_NAME
+        payload = index.export(args.k, args.exclude_same_farmer)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(payload, indent=2))
+        print(f"Wrote neighbours for {len(payload['neighbours'])} DMUs to {target}")
+        return
+
+    try:
+        if args.command == "knn":
+            results = index.knn(args.dmu_id, args.k, args.exclude_same_farmer)
+        else:
+            results = index.radius(args.dmu_id, args.radius, args.exclude_same_farmer)
+    except KeyError as exc:
+        raise SystemExit(exc.args[0]) from None
+    print_results(args.dmu_id, results)
+
+
+if __name__ == "__main__":
+    main()
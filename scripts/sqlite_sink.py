@@ -0,0 +1,170 @@
+"""
+Optional SQLite output for the converter scripts.
+
+Each converter can load its records into a local database next to the JSON
+files, so downstream consumers can query by DMU, farmer, season or operation
+through an index instead of re-parsing the full JSON.
+
+Run any converter with --sqlite (optionally followed by a path):
+    python3 scripts/convert_operations.py --sqlite
+    python3 scripts/convert_machines.py --sqlite /tmp/pivots.sqlite
+
+Every load replaces its tables in a single transaction, then refreshes the
+prepared views:
+  - dmu_inventory: operations, sowing, fertilisation and machines rows in
+    one shape, tagged with their source table
+  - factors_by_category: characterisation and singlescore totals keyed by
+    impact category
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DB = ROOT / "pivot_app" / "data" / "pivot_tables.sqlite"
+
+BATCH_SIZE = 1000
+
+INDEXED_COLUMNS = (
+    "dmu_id",
+    "farmer_id",
+    "season",
+    "operation_normalized",
+    "impact_category",
+)
+
+# Column set shared by every table in dmu_inventory; per-table aliases fill
+# gaps where a pivot names the same quantity differently.
+INVENTORY_TABLES = ("operations", "sowing", "fertilisation", "machines")
+INVENTORY_COLUMNS = (
+    "dmu_id",
+    "farmer_id",
+    "season",
+    "date",
+    "operation_category",
+    "operation",
+    "operation_normalized",
+    "equipment",
+    "product",
+    "dose_kg_ha",
+    "covered_area",
+)
+INVENTORY_ALIASES = {
+    "machines": {"covered_area": "total_area_worked"},
+}
+
+FACTOR_TABLES = ("characterisation", "singlescore")
+FACTOR_COLUMNS = ("impact_category", "unit", "product_id", "product_name", "total")
+
+
+def add_sqlite_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_DB,
+        default=None,
+        metavar="PATH",
+        help=f"also load the records into SQLite (default: {DEFAULT_DB.relative_to(ROOT)})",
+    )
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_type(values: Iterable[Any]) -> str:
+    seen = [v for v in values if v is not None and v != ""]
+    if seen and all(isinstance(v, int) and not isinstance(v, bool) for v in seen):
+        return "INTEGER"
+    if seen and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in seen):
+        return "REAL"
+    return "TEXT"
+
+
+def collect_columns(records: List[Dict[str, Any]]) -> List[str]:
+    columns: Dict[str, None] = {}
+    for rec in records:
+        for key in rec:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({quote(table)})")]
+
+
+def load_table(conn: sqlite3.Connection, table: str, records: List[Dict[str, Any]]) -> None:
+    columns = collect_columns(records)
+    conn.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+    if not columns:
+        return
+    definitions = ", ".join(
+        f"{quote(col)} {column_type(rec.get(col) for rec in records)}" for col in columns
+    )
+    conn.execute(f"CREATE TABLE {quote(table)} ({definitions})")
+    placeholders = ", ".join("?" for _ in columns)
+    insert = f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) VALUES ({placeholders})"
+    for start in range(0, len(records), BATCH_SIZE):
+        batch = records[start : start + BATCH_SIZE]
+        conn.executemany(insert, [tuple(rec.get(col) for col in columns) for rec in batch])
+    # Build indexes after the load so inserts don't pay for them row by row.
+    for col in INDEXED_COLUMNS:
+        if col in columns:
+            conn.execute(f"CREATE INDEX {quote(f'idx_{table}_{col}')} ON {quote(table)} ({quote(col)})")
+
+
+def union_view(
+    conn: sqlite3.Connection,
+    tables: Iterable[str],
+    columns: Iterable[str],
+    aliases: Dict[str, Dict[str, str]] | None = None,
+) -> str | None:
+    selects = []
+    for table in tables:
+        existing = set(table_columns(conn, table))
+        if not existing:
+            continue
+        table_aliases = (aliases or {}).get(table, {})
+        parts = [f"'{table}' AS source"]
+        for col in columns:
+            src = col if col in existing else table_aliases.get(col)
+            parts.append(f"{quote(src)} AS {quote(col)}" if src in existing else f"NULL AS {quote(col)}")
+        selects.append(f"SELECT {', '.join(parts)} FROM {quote(table)}")
+    return "\nUNION ALL\n".join(selects) if selects else None
+
+
+def refresh_views(conn: sqlite3.Connection) -> None:
+    views = {
+        "dmu_inventory": union_view(conn, INVENTORY_TABLES, INVENTORY_COLUMNS, INVENTORY_ALIASES),
+        "factors_by_category": union_view(conn, FACTOR_TABLES, FACTOR_COLUMNS),
+    }
+    for name, select in views.items():
+        conn.execute(f"DROP VIEW IF EXISTS {quote(name)}")
+        if select:
+            conn.execute(f"CREATE VIEW {quote(name)} AS {select}")
+
+
+def write_tables(db_path: Path, tables: Dict[str, List[Dict[str, Any]]]) -> None:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # Autocommit mode so the DDL and the inserts share one explicit transaction.
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        try:
+            for table, records in tables.items():
+                load_table(conn, table, records)
+            refresh_views(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    for table, records in tables.items():
+        print(f"Loaded {len(records)} rows into {table} in {db_path}")